@@ -330,3 +330,32 @@ def test_prb_82_085116_2010(p):
             )
             results_petsc = (-results_petsc.imag / np.pi).squeeze()
             assert np.allclose(results_petsc[: len(A_gt)], A_gt, atol=ATOL)
+
+
+@pytest.mark.skipif(not petsc_imported, reason="PETSc not installed")
+@pytest.mark.skipif(not mpi4py_imported, reason="mpi4py not installed")
+@pytest.mark.mpi(min_size=2)
+def test_uneven_jobs_between_brigades():
+    # the number of (k, w) points is not divisible by the number of brigades,
+    # so the brigades do different numbers of solves
+
+    COMM = MPI.COMM_WORLD
+    size = COMM.Get_size()
+    p = EFB_Figure5_k0_params
+    model = Model.from_parameters(**p["model_params"])
+    model.add_(**p["model_add_params"])
+    w_grid = p["gt"][:7, 0]
+    A_gt = p["gt"][:7, 1]
+
+    for brigade_size in range(1, size):
+        if size % brigade_size != 0:
+            continue
+        executor_petsc = MassSolverMUMPS(
+            system=System(model), mpi_comm=COMM, brigade_size=brigade_size
+        )
+        results_petsc = executor_petsc.greens_function(
+            p["k"], w_grid, eta=p["eta"]
+        )
+        assert results_petsc.shape == (1, len(w_grid))
+        results_petsc = (-results_petsc.imag / np.pi).squeeze()
+        assert np.allclose(results_petsc, A_gt, atol=ATOL)
@@ -0,0 +1,83 @@
+import pytest
+
+import numpy as np
+
+from ggce import Model, System
+
+mpi4py_imported = False
+try:
+    from mpi4py import MPI
+
+    mpi4py_imported = True
+except ImportError:
+    pass
+
+petsc_imported = False
+try:
+    from ggce.executors.petsc4py.solvers import MassSolverMUMPS
+
+    petsc_imported = True
+except ImportError:
+    pass
+
+
+def reference_values(executor, k, w, eta):
+    """This is the empirically correct matrix: every term coefficient is
+    evaluated on its own and summed into its matrix element. The batched
+    kernel used by the MassSolver should return the same values, in the order
+    of its sorted (row, column) sparsity pattern."""
+
+    system = executor.system
+    row_ind, col_ind, dat = [], [], []
+    total_bosons = np.sum(system.model.phonon_number)
+    for n_bosons in range(total_bosons + 1):
+        for eq in system.equations[n_bosons]:
+            row_dict = dict()
+            ii_basis = executor.basis[eq.index_term.id()]
+            for term in eq._terms_list + [eq.index_term]:
+                jj = executor.basis[term.id()]
+                coef = complex(np.ravel(term.coefficient(k, w, eta))[0])
+                row_dict[jj] = row_dict.get(jj, 0.0) + coef
+            row_ind.extend([ii_basis] * len(row_dict))
+            col_ind.extend(row_dict.keys())
+            dat.extend(row_dict.values())
+
+    row_ind, col_ind, dat = np.array(row_ind), np.array(col_ind), np.array(dat)
+    order = np.lexsort((col_ind, row_ind))
+    return row_ind[order], col_ind[order], dat[order]
+
+
+def get_executor(coupling, hopping, temperature):
+    model = Model.from_parameters(hopping=hopping, temperature=temperature)
+    tfd_params = dict()
+    if temperature > 0.0:
+        tfd_params = dict(phonon_extent_tfd=2, phonon_number_tfd=2)
+    model.add_(
+        coupling,
+        phonon_frequency=1.25,
+        phonon_extent=3,
+        phonon_number=3,
+        dimensionless_coupling_strength=2.5,
+        **tfd_params,
+    )
+    return MassSolverMUMPS(system=System(model), mpi_comm=MPI.COMM_WORLD)
+
+
+@pytest.mark.skipif(not petsc_imported, reason="PETSc not installed")
+@pytest.mark.skipif(not mpi4py_imported, reason="mpi4py not installed")
+@pytest.mark.parametrize(
+    "coupling", ["EdwardsFermionBoson", "Holstein", "Peierls", "BondPeierls"]
+)
+@pytest.mark.parametrize("hopping", [0.1, 0.0])
+@pytest.mark.parametrize("temperature", [0.0, 0.4])
+def test_evaluate_values(coupling, hopping, temperature):
+    executor = get_executor(coupling, hopping, temperature)
+    k, eta = 0.3, 0.05
+    w = [-2.1, -0.5, 0.7]
+
+    row_ind, col_ind, _ = executor._sparse_matrix_from_equations(k, w[0], eta)
+    for ww in w:
+        row_gt, col_gt, dat_gt = reference_values(executor, k, ww, eta)
+        assert np.array_equal(row_ind, row_gt)
+        assert np.array_equal(col_ind, col_gt)
+        assert np.allclose(executor._evaluate_values(k, ww, eta), dat_gt)
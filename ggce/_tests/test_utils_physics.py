@@ -48,3 +48,15 @@ def G0_k_omega(k, omega, a, eta, tf):
 @pytest.mark.parametrize("t", [0.0, 50.0])
 def test_G0_k_omega(k, o, e, t):
     assert G0_k_omega(k, o, 1.0, e, t) == physics.G0_k_omega(k, o, 1.0, e, t)
+
+
+@pytest.mark.parametrize("e", [0.1, 1e-8])
+@pytest.mark.parametrize("t", [0.0, 50.0])
+def test_G0_k_omega_array(e, t):
+    k = np.array([0.0, 0.5 * np.pi, np.pi])
+    o = np.array([-0.5, -50.0, 50.0, 1.0])
+    res = physics.G0_k_omega(k[:, None], o[None, :], 1.0, e, t)
+    assert res.shape == (len(k), len(o))
+    for ii, kk in enumerate(k):
+        for jj, oo in enumerate(o):
+            assert res[ii, jj] == G0_k_omega(kk, oo, 1.0, e, t)
@@ -0,0 +1,84 @@
+import pytest
+
+from ggce.utils.utils import Prefetcher
+
+
+class RecordingLoader:
+    """Loader which records the keys it was called with."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        self.calls.append(key)
+        return key * 10
+
+
+@pytest.mark.parametrize("depth", [1, 2, 5])
+def test_prefetcher_in_order(depth):
+    loader = RecordingLoader()
+    prefetcher = Prefetcher(loader, list(range(6)), depth=depth)
+    try:
+        assert [prefetcher.get(key) for key in range(6)] == [
+            key * 10 for key in range(6)
+        ]
+    finally:
+        prefetcher.close()
+
+    # every item was loaded exactly once, ahead of time
+    assert sorted(loader.calls) == list(range(6))
+
+
+def test_prefetcher_put():
+    loader = RecordingLoader()
+    prefetcher = Prefetcher(loader, [], depth=2)
+    try:
+        for key in range(4):
+            prefetcher.put(key)
+            assert prefetcher.get(key) == key * 10
+    finally:
+        prefetcher.close()
+    assert loader.calls == list(range(4))
+
+
+def test_prefetcher_skipped_keys_are_dropped():
+    loader = RecordingLoader()
+    prefetcher = Prefetcher(loader, list(range(6)), depth=3)
+    try:
+        assert prefetcher.get(2) == 20
+        queued_keys = [key for key, _ in prefetcher.queue]
+        assert 0 not in queued_keys
+        assert 1 not in queued_keys
+        assert queued_keys == [3, 4, 5]
+        assert prefetcher.get(5) == 50
+        assert len(prefetcher.queue) == 0
+    finally:
+        prefetcher.close()
+
+
+def test_prefetcher_unqueued_key_loaded_on_the_spot():
+    loader = RecordingLoader()
+    prefetcher = Prefetcher(loader, [0, 1], depth=2)
+    try:
+        queued_keys = [key for key, _ in prefetcher.queue]
+        assert prefetcher.get(7) == 70
+        assert 7 in loader.calls
+
+        # the queue is left untouched
+        assert [key for key, _ in prefetcher.queue] == queued_keys
+        assert prefetcher.get(0) == 0
+        assert prefetcher.get(1) == 10
+    finally:
+        prefetcher.close()
+
+
+def test_prefetcher_close():
+    loader = RecordingLoader()
+    prefetcher = Prefetcher(loader, list(range(6)), depth=2)
+    prefetcher.get(0)
+    prefetcher.close()
+
+    assert len(prefetcher.queue) == 0
+    assert len(prefetcher.keys) == 0
+    with pytest.raises(RuntimeError):
+        prefetcher.executor.submit(loader, 0)
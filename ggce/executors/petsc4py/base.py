@@ -1,3 +1,5 @@
+import hashlib
+import json
 import numpy as np
 import time
 import os
@@ -6,14 +8,112 @@ from pathlib import Path
 
 from tqdm import tqdm
 
+from mpi4py import MPI
 from petsc4py import PETSc
 
 from ggce.logger import logger
-from ggce.utils.physics import G0_k_omega
-from ggce.utils.utils import chunk_jobs, padded_kw, float_to_list
+from ggce.engine.terms import EOMTerm, IndexTerm, NonIndexTerm
+from ggce.utils.physics import G0_k_omega, g0_delta_omega
+from ggce.utils.utils import (
+    chunk_jobs,
+    padded_kw,
+    float_to_list,
+    Prefetcher,
+)
 from ggce.executors.solvers import Solver
 
 BYTES_TO_GB = 1073741274
+MATR_META_FILE = "meta.json"
+MATR_ROW_FILE = "row.npy"
+MATR_COL_FILE = "col.npy"
+
+# Type codes of the terms, as understood by _coefficient_kernel
+INDEX_TERM = 0
+EOM_TERM = 1
+NON_INDEX_TERM = 2
+
+
+def _term_parameters(term):
+    """Extracts everything needed to evaluate the coefficient of a term,
+    mirroring the ``coefficient`` methods in :mod:`ggce.engine.terms`. Note
+    that like those methods, this assumes a 1D lattice.
+
+    Parameters
+    ----------
+    term : ggce.engine.terms.Term
+
+    Returns
+    -------
+    int, list
+        The type code of the term and its parameters: the constant prefactor,
+        the exponential shift, the argument of :math:`g_0` and the frequency
+        shift.
+    """
+
+    if isinstance(term, IndexTerm):
+        return INDEX_TERM, [1.0, 0.0, 0.0, 0.0]
+    if isinstance(term, EOMTerm):
+        return EOM_TERM, [term.constant_prefactor, term.exp_shift[0], 0.0, 0.0]
+    if isinstance(term, NonIndexTerm):
+        return NON_INDEX_TERM, [
+            term.constant_prefactor,
+            term.exp_shift[0],
+            term.g_arg[0],
+            term.freq_shift,
+        ]
+    logger.critical(f"Unknown term type {type(term)}")
+
+
+def _coefficient_kernel(term_type, term_params, k, w, eta, a, t):
+    """Evaluates the coefficients of many terms at once. This is the batched
+    equivalent of calling ``term.coefficient(k, w, eta)`` on every term.
+
+    Parameters
+    ----------
+    term_type : np.ndarray
+        The type codes of the terms.
+    term_params : np.ndarray
+        The parameters of the terms, of shape (n_terms, 4).
+    k : float
+        The momentum quantum number point of the calculation.
+    w : float
+        The frequency grid point of the calculation.
+    eta : float
+        The artificial broadening parameter of the calculation.
+    a : float
+        The lattice constant.
+    t : float
+        The hopping strength.
+
+    Returns
+    -------
+    np.ndarray
+        The complex coefficients of the terms.
+    """
+
+    prefactor, exp_shift, g_arg, freq_shift = term_params.T
+    vals = np.ones(len(term_type), dtype="complex128")
+
+    exp_term = np.exp(1j * k * a * exp_shift)
+
+    eom = term_type == EOM_TERM
+    vals[eom] = prefactor[eom] * G0_k_omega(k, w, a, eta, t) * exp_term[eom]
+
+    non_index = term_type == NON_INDEX_TERM
+    if t == 0.0:
+        # g0_delta_omega special-cases the zero hopping limit
+        g_contrib = np.where(
+            g_arg[non_index] != 0,
+            0.0,
+            1.0 / (w - freq_shift[non_index] + eta * 1j),
+        )
+    else:
+        g_contrib = g0_delta_omega(
+            g_arg[non_index], w - freq_shift[non_index], a, eta, t
+        )
+    vals[non_index] = prefactor[non_index] * exp_term[non_index] * g_contrib
+
+    return vals
 
 
 class MassSolver(Solver):
@@ -28,36 +128,41 @@ class MassSolver(Solver):
     @property
     def mpi_brigade(self):
         if self._brigade_size is not None:
-            return int(self.mpi_rank / self._brigade_size)
+            return self.mpi_rank // self._brigade_size
         return 0
 
     @property
     def mpi_comm_brigadier(self):
         return self._mpi_comm_brigadier
 
+    @property
+    def mpi_comm_sergeants(self):
+        """The communicator between the brigade sergeants (the ranks with
+        brigade_rank 0), ordered by brigade. It is MPI.COMM_NULL on all other
+        ranks."""
+        return self._mpi_comm_sergeants
+
     @property
     def brigade_size(self):
         if self._brigade_size is not None:
             return self._brigade_size
-        return self._mpi_comm.Get_size()
+        return self.mpi_world_size
 
     @property
     def brigades(self):
         if self._brigade_size is not None:
-            return int(self._mpi_comm.Get_size() / self._brigade_size)
+            return self.mpi_world_size // self._brigade_size
         return 1
 
     @property
     def brigade_rank(self):
-        if self._brigade_size is not None:
-            return self._mpi_comm_brigadier.Get_rank()
-        return self.mpi_rank
+        return self._brigade_rank
 
     @property
     def matr_dir(self):
         """This property sets the directory where the method
-        _scaffold_from_disk looks for pickled matrices (in CSR format).
-        It is set in __init__
+        _scaffold_from_disk looks for the matrices (in COO format) saved by
+        prepare_greens_function. It is set in __init__
         """
         if self._matr_dir is None:
             logger.warning("matr_dir not set -- GGCE will construct matrices.")
@@ -66,6 +171,10 @@ class MassSolver(Solver):
     def __init__(self, brigade_size=None, matr_dir=None, *args, **kwargs):
 
         super().__init__(*args, **kwargs)
+        self._pattern_cached = False
+        self._disk_pattern = None
+        self._prefetcher = None
+        self._petsc_pattern = None
         self._matr_dir = matr_dir
         if matr_dir is not None:
             self._matr_dir = Path(matr_dir)
@@ -88,6 +197,12 @@ class MassSolver(Solver):
                 "Using original MPI_COMM."
             )
             self._mpi_comm_brigadier = self._mpi_comm
+        self._brigade_rank = self._mpi_comm_brigadier.Get_rank()
+
+        # the brigade sergeants report the results of their brigades
+        self._mpi_comm_sergeants = self._mpi_comm.Split(
+            0 if self.brigade_rank == 0 else MPI.UNDEFINED, self.mpi_brigade
+        )
 
     def split_into_brigades(self):
         """Splits the MPI_COMM provided into 'brigades' of ranks operating
@@ -161,6 +276,10 @@ class MassSolver(Solver):
         # Now we create the solution vector, x in Ax = b
         self._vector_x = self._vector_b.duplicate()
 
+        # as well as scratch vectors for the manual convergence check
+        self._vector_res = self._vector_b.duplicate()
+        self._vector_pc = self._vector_b.duplicate()
+
         # Now determine what is the local size PETSc picked
         _n_local = self._vector_b.getLocalSize()
 
@@ -190,6 +309,249 @@ class MassSolver(Solver):
         # This actually creates the matrix
         self._mat_X.setUp()
 
+    def _reuse_petsc_structs(self, row_ind, col_ind):
+        """Sets up the PETSc vectors and matrix unless they were already set
+        up for the same sparsity pattern, in which case they are reused as is
+        and only their values need to be updated.
+
+        Parameters
+        ----------
+        row_ind : array_like
+            The row coordinates of the nonzero entries.
+        col_ind : array_like
+            The column coordinates of the nonzero entries.
+
+        Returns
+        -------
+        bool
+            Whether the PETSc structures are reused, i.e. whether the matrix
+            is already preallocated.
+        """
+
+        if self._petsc_pattern is not None:
+            _row_ind, _col_ind = self._petsc_pattern
+            if _row_ind is row_ind and _col_ind is col_ind:
+                return True
+
+        self._setup_petsc_structs()
+        self._petsc_pattern = (row_ind, col_ind)
+        return False
+
+    def _count_nnz(self, row_ind, col_ind):
+        """Counts the number of nonzero entries in each row owned by this MPI
+        process, split between the diagonal and off-diagonal blocks of the
+        matrix, as required by PETSc's preallocation.
+
+        Parameters
+        ----------
+        row_ind : array_like
+            The row coordinates of the nonzero entries.
+        col_ind : array_like
+            The column coordinates of the nonzero entries.
+
+        Returns
+        -------
+        np.ndarray, np.ndarray
+            The number of nonzero entries per owned row in the diagonal and
+            in the off-diagonal block.
+        """
+
+        row_ind = np.asarray(row_ind, dtype="i4")
+        col_ind = np.asarray(col_ind, dtype="i4")
+
+        # check which rows are owned by this MPI process
+        owned = (row_ind >= self._rstart) & (row_ind < self._rend)
+        local_rows = row_ind[owned] - self._rstart
+        cols = col_ind[owned]
+
+        # diagonal entries are those whose column is also owned
+        is_diag = (cols >= self._rstart) & (cols < self._rend)
+        n_local = self._rend - self._rstart
+        diag_nnz = np.bincount(local_rows[is_diag], minlength=n_local)
+        offdiag_nnz = np.bincount(local_rows[~is_diag], minlength=n_local)
+
+        return diag_nnz.astype("i4"), offdiag_nnz.astype("i4")
+
+    def _fill_matrix(self, row_ind, col_ind, dat, preallocated=False):
+        """Preallocates and fills the rows of the PETSc matrix owned by this
+        MPI process, then assembles it. When available (PETSc >= 3.15), the
+        COO interface is used, which hands PETSc all entries in just two
+        calls. Otherwise, the matrix is preallocated row by row and the
+        entries are set one row at a time.
+
+        Parameters
+        ----------
+        row_ind : array_like
+            The row coordinates of the nonzero entries.
+        col_ind : array_like
+            The column coordinates of the nonzero entries.
+        dat : array_like
+            The values of the nonzero entries.
+        preallocated : bool, optional
+            If True, the matrix was already preallocated (and filled) with the
+            same sparsity pattern, and only its values are replaced (the
+            default is False).
+        """
+
+        row_ind = np.asarray(row_ind)
+        col_ind = np.asarray(col_ind)
+        dat = np.asarray(dat)
+
+        # only pass the entries in rows owned by this MPI process, since
+        # PETSc sums entries provided more than once
+        owned = (row_ind >= self._rstart) & (row_ind < self._rend)
+
+        if hasattr(self._mat_X, "setPreallocationCOO"):
+            if not preallocated:
+                self._mat_X.setPreallocationCOO(
+                    np.asarray(row_ind[owned], dtype=PETSc.IntType),
+                    np.asarray(col_ind[owned], dtype=PETSc.IntType),
+                )
+            self._mat_X.setValuesCOO(
+                np.asarray(dat[owned], dtype=PETSc.ScalarType),
+                addv=PETSc.InsertMode.INSERT_VALUES,
+            )
+        else:
+            if preallocated:
+                self._mat_X.zeroEntries()
+            else:
+                # parse out the nonzero (nnz) matrix structure across rows
+                # so we can pre-allocate enough space for the matrix
+                # avoid wasting space and speed up assembly ~ 20x
+                self._mat_X.setPreallocationNNZ(
+                    self._count_nnz(row_ind, col_ind)
+                )
+
+            # group the entries by row, and set each row in a single call
+            rows, cols, vals = row_ind[owned], col_ind[owned], dat[owned]
+            order = np.lexsort((cols, rows))
+            rows, cols, vals = rows[order], cols[order], vals[order]
+            starts = np.flatnonzero(np.diff(rows, prepend=-1))
+            ends = np.append(starts[1:], rows.size)
+            for start, end in zip(starts, ends):
+                self._mat_X.setValues(
+                    rows[start],
+                    cols[start:end],
+                    vals[start:end],
+                    addv=PETSc.InsertMode.ADD_VALUES,
+                )
+
+        # Assemble the matrix now that the values are filled in
+        self._mat_X.assemblyBegin(self._mat_X.AssemblyType.FINAL)
+        self._mat_X.assemblyEnd(self._mat_X.AssemblyType.FINAL)
+
+    def _build_term_arrays(self):
+        """Walks the GGCE equations once and flattens every term (including
+        the index terms) into a structure-of-arrays representation that
+        :func:`_coefficient_kernel` can evaluate in a single call. None of
+        these arrays depend on ``(k, w, eta)``.
+
+        Returns
+        -------
+        np.ndarray, np.ndarray, np.ndarray, np.ndarray
+            The row and column coordinate of every term, its type code and
+            its parameters (see :func:`_term_parameters`).
+        """
+
+        total_bosons = np.sum(self._system.model.phonon_number)
+        equations = [
+            eq
+            for n_bosons in range(total_bosons + 1)
+            for eq in self._system.equations[n_bosons]
+        ]
+
+        # first pass: count the total number of terms (including the index
+        # terms) so the arrays can be preallocated
+        n_terms = sum(len(eq._terms_list) + 1 for eq in equations)
+        rows = np.empty(n_terms, dtype="i4")
+        cols = np.empty(n_terms, dtype="i4")
+        term_type = np.empty(n_terms, dtype="i1")
+        term_params = np.empty((n_terms, 4), dtype="f8")
+
+        # second pass: fill the arrays slice by slice, one equation at a time
+        offset = 0
+        for eq in equations:
+            terms = eq._terms_list + [eq.index_term]
+            n = len(terms)
+            rows[offset : offset + n] = self._basis[eq.index_term.id()]
+            cols[offset : offset + n] = [
+                self._basis[term.id()] for term in terms
+            ]
+            for ii, term in enumerate(terms):
+                term_type[offset + ii], term_params[offset + ii] = (
+                    _term_parameters(term)
+                )
+            offset += n
+
+        return rows, cols, term_type, term_params
+
+    def _build_pattern(self):
+        """Builds the sparsity pattern of the matrix, which only depends on
+        the basis and the equations and not on ``(k, w, eta)``. It is thus
+        computed only once and reused for every point of a sweep. Sets the
+        (deduplicated) row and column coordinates of the nonzero entries, as
+        well as the information needed to quickly evaluate their values in
+        :meth:`_evaluate_values`."""
+
+        rows, cols, term_type, term_params = self._build_term_arrays()
+
+        # terms which map to the same matrix element are summed, so find the
+        # unique elements and the element each term contributes to
+        key = rows.astype(np.int64) * len(self._basis) + cols
+        unique_key, inverse = np.unique(key, return_inverse=True)
+        row_ind, col_ind = np.divmod(unique_key, len(self._basis))
+
+        # many terms share the same coefficient, which is then evaluated
+        # only once
+        unique_params, params_inverse = np.unique(
+            np.column_stack((term_type, term_params)),
+            axis=0,
+            return_inverse=True,
+        )
+
+        self._row_ind = row_ind.astype("i4")
+        self._col_ind = col_ind.astype("i4")
+        self._term_inverse = inverse.ravel()
+        self._term_type = unique_params[:, 0].astype("i1")
+        self._term_params = unique_params[:, 1:]
+        self._params_inverse = params_inverse.ravel()
+        self._pattern_cached = True
+
+    def _evaluate_values(self, k, w, eta):
+        """Evaluates the values of the nonzero entries of the matrix, in the
+        order of the sparsity pattern built by :meth:`_build_pattern`.
+
+        Parameters
+        ----------
+        k : float
+            The momentum quantum number point of the calculation.
+        w : float
+            The frequency grid point of the calculation.
+        eta : float
+            The artificial broadening parameter of the calculation.
+
+        Returns
+        -------
+        np.ndarray
+            The values of the nonzero entries of the matrix.
+        """
+
+        vals = _coefficient_kernel(
+            self._term_type,
+            self._term_params,
+            k,
+            w,
+            eta,
+            self._system.model.lattice_constant,
+            self._system.model.hopping,
+        )[self._params_inverse]
+
+        # sum the contributions of terms which map to the same matrix element
+        dat = np.zeros(self._row_ind.size, dtype="complex128")
+        np.add.at(dat, self._term_inverse, vals)
+
+        return dat
+
     def _sparse_matrix_from_equations(self, k, w, eta):
         """This function iterates through the GGCE equations dicts to extract
         the row, column coordiante and value of the nonzero entries in the
@@ -208,39 +570,24 @@ class MassSolver(Solver):
 
         Returns
         -------
-        list, list, list
-            The row and column coordinate lists, as well as a list of values of
-            the matrix that are nonzero.
+        np.ndarray, np.ndarray, np.ndarray
+            The row and column coordinate arrays, as well as an array of values
+            of the matrix that are nonzero. Duplicate (row, column) entries
+            are summed, and the entries are sorted by row, then column.
         """
 
-        row_ind = []
-        col_ind = []
-        dat = []
+        if not self._pattern_cached:
+            self._build_pattern()
 
-        total_bosons = np.sum(self._system.model.phonon_number)
-        for n_bosons in range(total_bosons + 1):
-            for eq in self._system.equations[n_bosons]:
-                row_dict = dict()
-                index_term_id = eq.index_term.id()
-                ii_basis = self._basis[index_term_id]
-
-                for term in eq._terms_list + [eq.index_term]:
-                    jj = self._basis[term.id()]
-                    try:
-                        row_dict[jj] += term.coefficient(k, w, eta)
-                    except KeyError:
-                        row_dict[jj] = term.coefficient(k, w, eta)
-
-                row_ind.extend([ii_basis for _ in range(len(row_dict))])
-                col_ind.extend([key for key, _ in row_dict.items()])
-                dat.extend([value for _, value in row_dict.items()])
-
-        # estimate sparse matrix memory usage
-        # (complex (16 bytes) + int (4 bytes) + int) * nonzero entries
-        est_mem_used = 24 * len(dat) / BYTES_TO_GB
-        logger.debug(f"Estimated memory needed is {est_mem_used:.02f} MB")
-
-        return row_ind, col_ind, dat
+        dat = self._evaluate_values(k, w, eta)
+
+        # sparse matrix memory usage
+        est_mem_used = (
+            self._row_ind.nbytes + self._col_ind.nbytes + dat.nbytes
+        ) / BYTES_TO_GB
+        logger.debug(f"Estimated memory needed is {est_mem_used:.02f} GB")
+
+        return self._row_ind, self._col_ind, dat
 
     def _scaffold(self, k, w, eta):
         """This function uses the GGCE equation sparse format data to construct
@@ -267,57 +614,24 @@ class MassSolver(Solver):
 
         # quickly report the sparsity of the matrix
         self._lengthdat = len(dat)
-        self._sparsity = (
-            self._linsys_size**2 - len(dat)
-        ) / self._linsys_size**2
+        n2 = self._linsys_size * self._linsys_size
+        self._sparsity = (n2 - len(dat)) / n2
         self._edge_sparsity = len(dat) / self._linsys_size
 
         t0 = time.time()
 
-        # parse out the nonzero (nnz) matrix structure across rows
-        # so we can pre-allocate enough space for the matrix
-        # avoid wasting space and speed up assembly ~ 20x
-
-        # Call structs to initialize the PETSc vectors and matrices
-        self._setup_petsc_structs()
+        # Call structs to initialize the PETSc vectors and matrices, unless
+        # they can be reused from the previous (k, w) point
+        preallocated = self._reuse_petsc_structs(row_ind, col_ind)
 
-        # set up arrays of length equal to space owned by a given MPI process
-        # diag and offdiag store the number of nonzero entries in a given row
-        # in the diagonal or off-diagonal block of the matrix
-        diag_nnz = np.zeros(self._rend - self._rstart, dtype="i4")
-        offdiag_nnz = np.zeros(self._rend - self._rstart, dtype="i4")
-
-        # iterate through coo notation arrays to identify the nonzero entry
-        # number in each row
-        for i, elem in enumerate(row_ind):
-            # check if this row / column is owned by this MPI process
-            if self._rstart <= elem and elem < self._rend:
-                if self._rstart <= col_ind[i] and col_ind[i] < self._rend:
-                    diag_nnz[elem - self._rstart] += 1
-                else:
-                    offdiag_nnz[elem - self._rstart] += 1
-
-        # pass the nnz arrays to PETSC matrix
-        self._mat_X.setPreallocationNNZ((diag_nnz, offdiag_nnz))
-
-        # now populate the matrix with actual values
-        row_start = np.zeros(1, dtype="i4")
-        col_pos = np.zeros(1, dtype="i4")
-        val = np.zeros(1, dtype="complex128")
-        for ii, row_coo in enumerate(row_ind):
-            if self._rstart <= row_coo and row_coo < self._rend:
-                row_start, col_pos, val = row_coo, col_ind[ii], dat[ii]
-                self._mat_X.setValues(row_start, col_pos, val)
-
-        # Assemble the matrix now that the values are filled in
-        self._mat_X.assemblyBegin(self._mat_X.AssemblyType.FINAL)
-        self._mat_X.assemblyEnd(self._mat_X.AssemblyType.FINAL)
+        # Preallocate and populate the matrix with the actual values
+        self._fill_matrix(row_ind, col_ind, dat, preallocated)
 
         # Assign values for the b vector
         a = self._system.model.lattice_constant
         t = self._system.model.hopping
         G0 = G0_k_omega(k, w, a, eta, t)
-        self._vector_b.setValues(self._linsys_size - 1, G0)
+        self._vector_b.setValue(self._linsys_size - 1, G0)
 
         # Need to assemble before use
         self._vector_b.assemblyBegin()
@@ -356,68 +670,50 @@ class MassSolver(Solver):
         assert matr_dir is not None
         self._linsys_size = self._get_matr_size(matr_dir)
 
-        matrix_loc = os.path.join(
-            matr_dir, f"matr_at_k_{k:.10f}_w_{w:.10f}_e_{eta:.10f}.pkl"
-        )
-        with open(matrix_loc, "rb") as datafile:
-            row_ind, col_ind, dat = pickle.load(datafile)
+        matrix_loc = self._get_matr_path(matr_dir, k, w, eta)
+        if matrix_loc.exists():
+            # the sparsity pattern is shared by all matrices, and all arrays
+            # are memory-mapped rather than read in full
+            if self._disk_pattern is None:
+                self._disk_pattern = (
+                    np.load(Path(matr_dir) / MATR_ROW_FILE, mmap_mode="r"),
+                    np.load(Path(matr_dir) / MATR_COL_FILE, mmap_mode="r"),
+                )
+            row_ind, col_ind = self._disk_pattern
+            if self._prefetcher is not None:
+                dat = self._prefetcher.get(matrix_loc)
+            else:
+                dat = np.load(matrix_loc, mmap_mode="r")
+        else:
+            # matrices prepared by older versions of GGCE were pickled
+            logger.warning(
+                f"{matrix_loc} not found, attempting to load the pickled "
+                "matrix instead. Pickled matrices are deprecated."
+            )
+            fname = f"matr_at_k_{k:.10f}_w_{w:.10f}_e_{eta:.10f}.pkl"
+            with open(Path(matr_dir) / fname, "rb") as datafile:
+                row_ind, col_ind, dat = pickle.load(datafile)
+            dat = np.array([complex(np.ravel(val)[0]) for val in dat])
 
         # quickly report the sparsity of the matrix
         self._lengthdat = len(dat)
-        self._sparsity = (
-            self._linsys_size**2 - len(dat)
-        ) / self._linsys_size**2
+        n2 = self._linsys_size * self._linsys_size
+        self._sparsity = (n2 - len(dat)) / n2
         self._edge_sparsity = len(dat) / self._linsys_size
         t0 = time.time()
 
-        # parse out the nonzero (nnz) matrix structure across rows
-        # so we can pre-allocate enough space for the matrix
-        # avoid wasting space and speed up assembly ~ 20x
+        # Call structs to initialize the PETSc vectors and matrices, unless
+        # they can be reused from the previous (k, w) point
+        preallocated = self._reuse_petsc_structs(row_ind, col_ind)
 
-        # Call structs to initialize the PETSc vectors and matrices
-        self._setup_petsc_structs()
-
-        # set up arrays of length equal to space owned by a given MPI process
-        # diag and offdiag store the number of nonzero entries in a given row
-        # in the diagonal or off-diagonal block of the matrix
-        diag_nnz = np.zeros(self._rend - self._rstart, dtype="i4")
-        offdiag_nnz = np.zeros(self._rend - self._rstart, dtype="i4")
-
-        # iterate through coo notation arrays to identify the nonzero entry
-        # number in each row
-        for i, elem in enumerate(row_ind):
-            # check if this row / column is owned by this MPI process
-            if self._rstart <= elem and elem < self._rend:
-                if self._rstart <= col_ind[i] and col_ind[i] < self._rend:
-                    diag_nnz[elem - self._rstart] += 1
-                else:
-                    offdiag_nnz[elem - self._rstart] += 1
-
-        # pass the nnz arrays to PETSC matrix
-        self._mat_X.setPreallocationNNZ((diag_nnz, offdiag_nnz))
-
-        # now populate the matrix with actual values
-        row_start = np.zeros(1, dtype="i4")
-        col_pos = np.zeros(1, dtype="i4")
-        val = np.zeros(1, dtype="complex128")
-        for ii, row_coo in enumerate(row_ind):
-            if self._rstart <= row_coo and row_coo < self._rend:
-                row_start, col_pos, val = row_coo, col_ind[ii], dat[ii]
-                logger.debug(
-                    f"I am rank {self.mpi_rank} and I am setting"
-                    f" the values at {(row_start, col_pos)}"
-                )
-                self._mat_X.setValues(row_start, col_pos, val)
-
-        # Assemble the matrix now that the values are filled in
-        self._mat_X.assemblyBegin(self._mat_X.AssemblyType.FINAL)
-        self._mat_X.assemblyEnd(self._mat_X.AssemblyType.FINAL)
+        # Preallocate and populate the matrix with the actual values
+        self._fill_matrix(row_ind, col_ind, dat, preallocated)
 
         # Assign values for the b vector
         a = self._system.model.lattice_constant
         t = self._system.model.hopping
         G0 = G0_k_omega(k, w, a, eta, t)
-        self._vector_b.setValues(self._linsys_size - 1, G0)
+        self._vector_b.setValue(self._linsys_size - 1, G0)
 
         # Need to assemble before use
         self._vector_b.assemblyBegin()
@@ -451,15 +747,16 @@ class MassSolver(Solver):
         The residual check is conducted in place, nothing is returned.
         """
 
-        # compute the residual and apply the preconditioner
-        _vector_res = self._vector_b.copy()
-        pc.apply(self._vector_b - self._mat_X(self._vector_x), _vector_res)
-        _vector_res_norm = _vector_res.norm(PETSc.NormType.NORM_2)
+        # compute the residual and apply the preconditioner, using the scratch
+        # vectors to avoid allocating temporaries
+        self._mat_X.mult(self._vector_x, self._vector_res)
+        self._vector_res.aypx(-1.0, self._vector_b)
+        pc.apply(self._vector_res, self._vector_pc)
+        _vector_res_norm = self._vector_pc.norm(PETSc.NormType.NORM_2)
         # tolerance comparison is based on rtol * b magnitude, which also needs
         # to be preconditioned
-        _vector_b_condt = self._vector_b.duplicate()
-        pc.apply(self._vector_b, _vector_b_condt)
-        _vector_b_norm = _vector_b_condt.norm(PETSc.NormType.NORM_2)
+        pc.apply(self._vector_b, self._vector_pc)
+        _vector_b_norm = self._vector_pc.norm(PETSc.NormType.NORM_2)
 
         # create variable measuring how much tolerance is met / exceeded
         # if positive, we are in trouble
@@ -504,19 +801,6 @@ class MassSolver(Solver):
         k = float_to_list(k)
         w = float_to_list(w)
 
-        # the jobs MUST be evenly divisible between brigades
-        # we will force pad the arrays if this is not the case
-        # and raise a warning
-        try:
-            assert len(k) * len(w) % self.brigades == 0
-        except AssertionError:
-            logger.warning(
-                "Number of jobs (k,w points) is not evenly "
-                "divisible between brigades. Padding initiated."
-                " If you don't want this, change your k, w arrays."
-            )
-            k, w = padded_kw(k, w, self.brigades)
-
         # Generate a list of tuples for the (k, w) points to calculate.
         jobs = [(_k, _w) for _k in k for _w in w]
 
@@ -532,42 +816,63 @@ class MassSolver(Solver):
                 "fly from the basis."
             )
 
-        # Chunk the jobs appropriately. Each of these lists look like the jobs
-        # list above.
-        jobs_on_brigade = self.get_jobs_on_this_brigade(jobs)
-        self._total_jobs_on_this_brigade = len(jobs_on_brigade)
-        # Get the results on this rank.
+        # When loading from disk, read the next matrices in the background
+        # while the current one is being solved. Matrices pickled by older
+        # versions of GGCE are loaded on the spot instead
+        if (
+            self._matr_dir is not None
+            and (Path(self._matr_dir) / MATR_META_FILE).exists()
+        ):
+            self._prefetcher = Prefetcher(np.load, [])
+
+        # Get the results on this rank. The jobs are handed out to the
+        # brigades on demand, so that a brigade drawing the expensive (k, w)
+        # points does not hold up the others. Each result is stored with the
+        # index of its job.
         s = []
-        for (_k, _w) in tqdm(jobs_on_brigade, disable=not pbar):
-            s.append(self.solve(_k, _w, eta))
-
-        # Gather the results from the brigade commanders to "the general"
-        # (global rank 0)
-        all_results = self._mpi_comm.gather(s, root=0)
+        dispatched = self._dispatch_jobs_dynamically(
+            len(jobs), lookahead=self._prefetcher is not None
+        )
+        # the job indexes are global, so the progress bar tracks the number
+        # of jobs handed out to all brigades
+        progress = tqdm(total=len(jobs), disable=not pbar)
+        try:
+            for ii, ii_next in dispatched:
+                if ii_next is not None:
+                    _k, _w = jobs[ii_next]
+                    self._prefetcher.put(
+                        self._get_matr_path(self._matr_dir, _k, _w, eta)
+                    )
+                s.append((ii, self.solve(*jobs[ii], eta)))
+                progress.update(max(ii + 1 - progress.n, 0))
+        finally:
+            progress.close()
+            dispatched.close()
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self._prefetcher = None
+        logger.debug("Brigade {} finished {} jobs", self.mpi_brigade, len(s))
+
+        # Gather the results from the brigade sergeants to "the general"
+        # (global rank 0). Every rank in a brigade holds a copy of the
+        # results of the brigade, so only the sergeants need to send them
+        all_results = None
+        if self.brigade_rank == 0:
+            all_results = self._mpi_comm_sergeants.gather(s, root=0)
         # create placeholder variables for final bcast of results
         res = None
         meta = None
 
-        # need to get rid of duplicates, since each rank in a brigade sends
-        # a copy of the results from the brigade
         if self.mpi_rank == 0:
-            results = []
-            if self.brigade_size > 1:
-                for n in range(self.brigades):
-                    results.append(all_results[int(n * self.brigade_size)])
-            else:
-                results = all_results
+            results = [xx[ii] for xx in all_results for ii in range(len(xx))]
 
-            results = [xx[ii] for xx in results for ii in range(len(xx))]
+            # restore the order of the jobs
+            results = [xx[1] for xx in sorted(results, key=lambda xx: xx[0])]
 
-            # a copy of the results of the whole brigade
             s = [xx[0] for xx in results]
             meta = [xx[1] for xx in results]
             res = np.array(s)
 
-            # remove nans from the padding
-            res = res[~np.isnan(res)]
-
             # Ensure the returned array has the proper shape
             res = res.reshape(len(k), len(w))
 
@@ -580,6 +885,64 @@ class MassSolver(Solver):
             return (res, meta)
         return res
 
+    def _dispatch_jobs_dynamically(self, n_jobs, lookahead=False):
+        """Hands out the jobs to the brigades on demand. The brigade sergeants
+        draw the index of their next job from a counter living on global rank
+        0 using one-sided MPI atomics, so that no rank has to be set aside to
+        coordinate the others, and broadcast it within their brigade.
+
+        Parameters
+        ----------
+        n_jobs : int
+            The total number of jobs.
+        lookahead : bool, optional
+            If True, the next job of the brigade is drawn before the current
+            one is handed out, e.g. to prefetch its matrix (the default is
+            False).
+
+        Yields
+        ------
+        int, int
+            The index of the job to run, and the index of the next job of the
+            brigade. The latter is None if there is no next job or if
+            lookahead is False.
+        """
+
+        window = None
+        if self.brigade_rank == 0:
+            itemsize = MPI.INT64_T.Get_size()
+            window = MPI.Win.Allocate(
+                itemsize if self.mpi_rank == 0 else 0,
+                itemsize,
+                comm=self._mpi_comm_sergeants,
+            )
+            if self.mpi_rank == 0:
+                window.Lock(0)
+                window.Put(np.zeros(1, dtype=np.int64), 0)
+                window.Unlock(0)
+            self._mpi_comm_sergeants.barrier()
+
+        def draw():
+            ii = None
+            if self.brigade_rank == 0:
+                ii = np.empty(1, dtype=np.int64)
+                window.Lock(0)
+                window.Fetch_and_op(np.ones(1, dtype=np.int64), ii, 0)
+                window.Unlock(0)
+                ii = int(ii[0])
+            ii = self._mpi_comm_brigadier.bcast(ii, root=0)
+            return ii if ii < n_jobs else None
+
+        try:
+            ii = draw()
+            while ii is not None:
+                ii_next = draw() if lookahead else None
+                yield ii, ii_next
+                ii = ii_next if lookahead else draw()
+        finally:
+            if window is not None:
+                window.Free()
+
     def prepare_system(self, k, w, eta):
         """Prepare the sparse-represented system to be solved by another
         executor.
@@ -588,24 +951,28 @@ class MassSolver(Solver):
         ----------
         k : float
             The momentum quantum number point of the calculation.
-        w : float
-            The frequency grid point of the calculation.
+        w : float or array_like
+            The frequency grid point(s) of the calculation. A matrix is saved
+            for every frequency.
         eta : float
             The artificial broadening parameter of the calculation.
 
         Returns
         -------
-            Nothing is returned, the matrix is dumped to disk.
+            Nothing is returned, the matrices are dumped to disk.
         """
 
-        row_ind, col_ind, dat = self._sparse_matrix_from_equations(k, w, eta)
-        xx = [row_ind, col_ind, dat]
+        # The sparsity pattern is the same for all matrices, and is saved only
+        # once alongside the system size
+        if not (self.matr_dir / MATR_META_FILE).exists():
+            self._save_pattern()
+        if not self._pattern_cached:
+            self._build_pattern()
 
-        matr_loc = os.path.join(
-            self.matr_dir, f"matr_at_k_{k:.10f}_w_{w:.10f}_e_{eta:.10f}.pkl"
-        )
-        with open(matr_loc, "wb") as matr_file:
-            pickle.dump(xx, matr_file)
+        for _w in np.atleast_1d(w):
+            path = self._get_matr_path(self.matr_dir, k, _w, eta)
+            path.parent.mkdir(exist_ok=True)
+            np.save(path, self._evaluate_values(k, _w, eta))
 
     def prepare_greens_function(
         self, k, w, eta, return_meta=False, pbar=False
@@ -655,8 +1022,20 @@ class MassSolver(Solver):
             f"Matrices are being saved to {self._matr_dir}."
         )
 
+        # Save the sparsity pattern and the size of the linear system once,
+        # before any of the ranks start saving matrices
+        if self.mpi_rank == 0:
+            self._save_pattern()
+        self._mpi_comm.barrier()
+
+        # Group the jobs by momentum, so that the matrices at all the
+        # frequencies of a given momentum are prepared together
+        w_on_brigade = dict()
+        for _k, _w in jobs_on_brigade:
+            w_on_brigade.setdefault(_k, []).append(_w)
+
         # Get the results on this rank.
-        for (_k, _w) in tqdm(jobs_on_brigade, disable=not pbar):
+        for _k, _w in tqdm(w_on_brigade.items(), disable=not pbar):
             self.prepare_system(_k, _w, eta)
 
         return
@@ -666,12 +1045,48 @@ class MassSolver(Solver):
         # Note this will have to be redone when k is a vector in 2 and 3D!
         return f"{k:.10f}_{omega:.10f}_{eta:.10f}"
 
+    def _save_pattern(self):
+        """Saves the sparsity pattern shared by all the matrices, as well as
+        the size of the linear system, to ``matr_dir``."""
+
+        if not self._pattern_cached:
+            self._build_pattern()
+
+        np.save(self.matr_dir / MATR_ROW_FILE, self._row_ind)
+        np.save(self.matr_dir / MATR_COL_FILE, self._col_ind)
+
+        # the metadata is written last, since its presence signals that the
+        # pattern is ready to be used
+        with open(self.matr_dir / MATR_META_FILE, "w") as f:
+            json.dump({"linsys_size": len(self._basis)}, f)
+
+    @classmethod
+    def _get_matr_path(cls, matr_dir, k, w, eta):
+        """Location of the values of the matrix prepared at ``(k, w, eta)``.
+        The file is named after the SHA1 hash of the point, and the files are
+        spread over subdirectories named after the first two characters of
+        the hash, which keeps the directories small for large sweeps."""
+
+        key = cls._k_omega_eta_to_str(k, w, eta).encode()
+        h = hashlib.sha1(key).hexdigest()
+        return Path(matr_dir) / h[:2] / f"{h}.npy"
+
     @staticmethod
     def _get_matr_size(matr_dir):
-
         """For use with the _scaffold_from_disk method. Helps figure
-        out the ultimate matrix size before loading all in."""
-
+        out the ultimate matrix size before loading all in. The size is read
+        from the metadata file saved alongside the matrices if present, and
+        otherwise from one of the (deprecated) pickled matrices."""
+
+        meta_loc = Path(matr_dir) / MATR_META_FILE
+        if meta_loc.exists():
+            with open(meta_loc, "r") as f:
+                return json.load(f)["linsys_size"]
+
+        logger.warning(
+            f"No {MATR_META_FILE} found in {matr_dir}, reading the size "
+            "from a pickled matrix. Pickled matrices are deprecated."
+        )
         all_files = os.listdir(matr_dir)
         all_files = [elem for elem in all_files if ".pkl" in elem]
         random_matr = np.random.choice(all_files)
@@ -154,7 +154,9 @@ class MassSolverMUMPS(MassSolver):
         t0 = time.time()
 
         # Now construct the desired solver instance
-        ksp = PETSc.KSP().create()
+        # on the brigade communicator, since the brigades solve different
+        # numbers of (k, w) points
+        ksp = PETSc.KSP().create(comm=self._mpi_comm_brigadier)
 
         # "preonly" for e.g. mumps and other external solvers
         ksp.setType("preonly")
@@ -193,8 +195,6 @@ class MassSolverMUMPS(MassSolver):
         # now check memory usage
         self.check_mem_use(factored_mat)
 
-        self._mpi_comm_brigadier.barrier()
-
         # for memory management, destroy the KSP context manually
         ksp.destroy()
 
@@ -219,8 +219,6 @@ class MassSolverMUMPS(MassSolver):
             G_val = None
 
         # and bcast to all processes in your brigade
-        # self._mpi_comm_brigadier.Barrier()
-        # self._mpi_comm.Abort()
         G_val = self._mpi_comm_brigadier.bcast(G_val, root=0)
 
         # only checkpoint if you are the brigade commander
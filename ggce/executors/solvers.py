@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from pathlib import Path
 import pickle
 import warnings
@@ -37,15 +38,11 @@ class Solver(ABC):
 
     @property
     def mpi_rank(self):
-        if self._mpi_comm is not None:
-            return self._mpi_comm.Get_rank()
-        return 0
+        return self._mpi_rank
 
     @property
     def mpi_world_size(self):
-        if self._mpi_comm is not None:
-            return self._mpi_comm.Get_size()
-        return 1
+        return self._mpi_world_size
 
     def __init__(self, system=None, root=None, basis=None, mpi_comm=None):
         self._system = system
@@ -53,6 +50,13 @@ class Solver(ABC):
         self._mpi_comm = mpi_comm
         self._basis = basis
 
+        # the rank and size never change, so query the communicator once
+        self._mpi_rank = 0
+        self._mpi_world_size = 1
+        if self._mpi_comm is not None:
+            self._mpi_rank = self._mpi_comm.Get_rank()
+            self._mpi_world_size = self._mpi_comm.Get_size()
+
         if self._system is None and self._root is None:
             logger.critical("Either system, root or both must be provided")
 
@@ -70,12 +74,18 @@ class Solver(ABC):
 
         if self._system is None:
             # Attempt to load the system from its checkpoint... the system
-            # will now be initialized or an error will be thrown
-            self._system = System.from_checkpoint(self._root)
+            # will now be initialized or an error will be thrown. Only the
+            # head rank reads the checkpoint, and sends it to the others
+            if self.mpi_rank == 0:
+                self._system = System.from_checkpoint(self._root)
+            if self._mpi_comm is not None:
+                self._system = self._mpi_comm.bcast(self._system, root=0)
 
         # Force checkpoint the system, which at this point must be initialized
-        with disable_logger():
-            self._system.checkpoint()
+        # (all ranks hold the same system, so only the head rank writes it)
+        if self.mpi_rank == 0:
+            with disable_logger():
+                self._system.checkpoint()
 
         if self._root is not None:
             logger.info(f"System checkpointed to '/{self._root}'")
@@ -241,16 +251,13 @@ class SparseSolver(BasicSolver):
         total_bosons = np.sum(self._system.model.phonon_number)
         for n_bosons in range(total_bosons + 1):
             for eq in self._system.equations[n_bosons]:
-                row_dict = dict()
+                row_dict = defaultdict(complex)
                 index_term_id = eq.index_term.id()
                 ii_basis = self._basis[index_term_id]
 
                 for term in eq._terms_list + [eq.index_term]:
                     jj = self._basis[term.id()]
-                    try:
-                        row_dict[jj] += term.coefficient(k, w, eta)
-                    except KeyError:
-                        row_dict[jj] = term.coefficient(k, w, eta)
+                    row_dict[jj] += term.coefficient(k, w, eta)
 
                 row_ind.extend([ii_basis for _ in range(len(row_dict))])
                 col_ind.extend([key for key, _ in row_dict.items()])
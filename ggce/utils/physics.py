@@ -79,13 +79,15 @@ def G0_k_omega(k, omega, lattice_constant, eta, hopping):
 
         G_0(k, \\omega) = \\frac{1}{\\omega + i\\eta - \\varepsilon_k}
 
-    where :math:`\\varepsilon_k = -2t \\cos(ka)`.
+    where :math:`\\varepsilon_k = -2t \\cos(ka)`. The momentum and frequency
+    can also be arrays, in which case they are broadcast against each other
+    and :math:`G_0` is evaluated at all points at once.
 
     Parameters
     ----------
-    k : float
+    k : float or np.ndarray
         The momentum variable
-    omega : complex
+    omega : complex or np.ndarray
         The complex frequency variable.
     lattice_constant : float
         The lattice constant: distance between neighboring sites
@@ -96,7 +98,7 @@ def G0_k_omega(k, omega, lattice_constant, eta, hopping):
 
     Returns
     -------
-    complex
+    complex or np.ndarray
         Value of :math:`G_0`.
     """
 
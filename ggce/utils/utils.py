@@ -1,3 +1,5 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 import time
@@ -29,6 +31,63 @@ class Buffer:
             self.flush()
 
 
+class Prefetcher:
+    """Loads items ahead of time in a background thread, so that e.g. reading
+    files from disk overlaps with the computations performed on the items
+    loaded previously. The items are expected to be requested in the order
+    of the provided keys, though some of them may be skipped.
+
+    Parameters
+    ----------
+    loader : callable
+        Takes a key and returns the loaded item.
+    keys : list
+        The keys of the items which will be requested, in order.
+    depth : int, optional
+        The maximum number of items loaded ahead of time (the default is 2).
+    """
+
+    def __init__(self, loader, keys, depth=2):
+        self.loader = loader
+        self.keys = deque(keys)
+        self.depth = depth
+        self.queue = deque()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._fill()
+
+    def _fill(self):
+        while len(self.keys) > 0 and len(self.queue) < self.depth:
+            key = self.keys.popleft()
+            self.queue.append((key, self.executor.submit(self.loader, key)))
+
+    def put(self, key):
+        """Appends a key to the ones which will be requested."""
+
+        self.keys.append(key)
+        self._fill()
+
+    def get(self, key):
+        """Returns the item corresponding to the key. Items queued before it
+        are discarded, and items which were not queued are loaded on the spot.
+        """
+
+        if key not in [queued_key for queued_key, _ in self.queue]:
+            return self.loader(key)
+
+        while True:
+            queued_key, future = self.queue.popleft()
+            self._fill()
+            if queued_key == key:
+                return future.result()
+
+    def close(self):
+        for _, future in self.queue:
+            future.cancel()
+        self.queue.clear()
+        self.keys.clear()
+        self.executor.shutdown(wait=True)
+
+
 def chunk_jobs(jobs, world_size, rank):
     return np.array_split(jobs, world_size)[rank].tolist()
 